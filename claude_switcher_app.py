@@ -7,7 +7,14 @@ import os
 import sys
 import json
 import shutil
+import socket
+import ssl
+import threading
+import time
+import cProfile
+import tracemalloc
 from datetime import datetime
+from urllib.parse import urlparse
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -15,14 +22,240 @@ from tkinter import ttk, messagebox
 ZSHRC_PATH = os.path.expanduser("~/.zshrc")
 CONFIG_PATH = os.path.expanduser("~/.claude_provider_config.json")
 BACKUP_DIR = os.path.expanduser("~/.claude_provider_backups")
+PROFILE_DIR = os.path.expanduser("~/.claude_provider_profiles")
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/anthropic"
+
+
+def read_rw_syscall_counts():
+    """读取进程累计的 read/write 类系统调用次数，仅 Linux 的 /proc/self/io 提供"""
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            counts = dict(line.split(b':') for line in f.read().splitlines())
+        return int(counts[b'syscr']) + int(counts[b'syscw'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class Span:
+    """一个计时区间，记录耗时、读写字节数和 read/write 系统调用次数"""
+
+    def __init__(self, tracer, name, summarize=False):
+        self.tracer = tracer
+        self.name = name
+        self.summarize = summarize
+        self.depth = 0
+        self.start = 0.0
+        self.duration = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.rw_syscalls = None
+        self.nested = 0
+        self._syscalls_start = None
+
+    def add(self, bytes_read=0, bytes_written=0):
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+    def __enter__(self):
+        self.depth = len(self.tracer.stack)
+        self.tracer.stack.append(self)
+        self._syscalls_start = read_rw_syscall_counts()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        syscalls_end = read_rw_syscall_counts()
+        if self._syscalls_start is not None and syscalls_end is not None:
+            # 扣除本区间及所有子区间读取 /proc/self/io 自身产生的调用
+            probe_calls = self.tracer.probe_cost * (1 + 2 * self.nested)
+            self.rw_syscalls = max(0, syscalls_end - self._syscalls_start - probe_calls)
+        self.tracer.stack.pop()
+        if self.tracer.stack:
+            parent = self.tracer.stack[-1]
+            parent.add(self.bytes_read, self.bytes_written)
+            parent.nested += 1 + self.nested
+        self.tracer.spans.append(self)
+        if self.depth == 0 and self.summarize:
+            print(self.tracer.summary())
+        return False
+
+
+class NullSpan:
+    """关闭追踪时使用的空区间，不做任何记录"""
+
+    def add(self, bytes_read=0, bytes_written=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """轻量追踪器：记录嵌套区间，可导出 Chrome trace-event JSON 和单行摘要"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.stack = []
+        self.probe_cost = 0
+        if enabled:
+            self.probe_cost = self._measure_probe_cost()
+
+    def _measure_probe_cost(self):
+        """测量一次读取 /proc/self/io 本身计入的 read/write 调用次数"""
+        first = read_rw_syscall_counts()
+        second = read_rw_syscall_counts()
+        if first is None or second is None:
+            return 0
+        return second - first
+
+    def span(self, name, summarize=False):
+        """summarize 为 True 的顶层区间结束时打印单行摘要"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, summarize)
+
+    def summary(self):
+        """最近一次顶层区间及其直接子区间的单行摘要"""
+        if not self.spans or self.spans[-1].depth != 0:
+            return ""
+        root = self.spans[-1]
+        children = []
+        for span in reversed(self.spans[:-1]):
+            if span.depth == 0:
+                break
+            if span.depth == 1:
+                children.append(span)
+        parts = [f"{span.name} {span.duration * 1000:.2f}ms" for span in reversed(children)]
+        rw_syscalls = root.rw_syscalls if root.rw_syscalls is not None else "-"
+        line = (f"[trace] {root.name} {root.duration * 1000:.2f}ms "
+                f"r={root.bytes_read}B w={root.bytes_written}B rw_syscalls={rw_syscalls}")
+        if parts:
+            line += f" | {', '.join(parts)}"
+        return line
+
+    def export_chrome_trace(self, path):
+        """导出为 chrome://tracing / Perfetto 可读取的 trace-event JSON"""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = []
+        for span in self.spans:
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {
+                    "bytes_read": span.bytes_read,
+                    "bytes_written": span.bytes_written,
+                    "rw_syscalls": span.rw_syscalls
+                }
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, indent=2)
+        return path
+
+
+class ReachabilityChecker:
+    """可选的连通性检查：在后台解析 base_url 的 DNS，建立一次连接并计时后立即关闭
+
+    Claude Code 在独立进程中发送请求，这里不保留任何连接，结果只说明提供商是否可达。
+    """
+
+    def __init__(self, enabled=False, timeout=10):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.ssl_context = None
+        self.active = None
+        self.report = None
+        self.lock = threading.Lock()
+
+    def _endpoint(self, base_url):
+        parsed = urlparse(base_url or '')
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            return None
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        return parsed.scheme, parsed.hostname, port
+
+    def _connect(self, scheme, host, infos):
+        """与 socket.create_connection 一样依次尝试解析出的每个地址"""
+        last_error = None
+        for family, socktype, proto, _, address in infos:
+            sock = None
+            try:
+                sock = socket.socket(family, socktype, proto)
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+                if scheme == 'https':
+                    if self.ssl_context is None:
+                        self.ssl_context = ssl.create_default_context()
+                    sock = self.ssl_context.wrap_socket(sock, server_hostname=host)
+                return sock
+            except OSError as e:
+                last_error = e
+                if sock is not None:
+                    sock.close()
+        raise last_error or OSError("getaddrinfo 未返回任何地址")
+
+    def check(self, base_url):
+        """在后台线程中检查 base_url 是否可达，未启用时不做任何网络访问"""
+        if not self.enabled:
+            return None
+        endpoint = self._endpoint(base_url)
+        with self.lock:
+            self.active = endpoint
+            self.report = None if endpoint else f"base_url 无效: {base_url}"
+        if endpoint is None:
+            return None
+        thread = threading.Thread(target=self._check, args=(endpoint,), daemon=True)
+        thread.start()
+        return thread
+
+    def _check(self, endpoint):
+        scheme, host, port = endpoint
+        try:
+            start = time.perf_counter()
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            dns_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            sock = self._connect(scheme, host, infos)
+            connect_ms = (time.perf_counter() - start) * 1000
+            sock.close()
+            report = f"{host} 可达: DNS {dns_ms:.0f} ms, 建连 {connect_ms:.0f} ms"
+        except OSError as e:
+            report = f"{host} 不可达: {e}"
+
+        with self.lock:
+            if self.active == endpoint:
+                self.report = report
+        print(report)
+
+    def format_report(self):
+        """返回当前提供商的检查结果，未启用或未完成时返回 None"""
+        with self.lock:
+            return self.report
 
 
 class ProviderSwitcher:
     """提供商切换核心逻辑"""
 
-    def __init__(self):
+    def __init__(self, tracer=None):
+        self.tracer = tracer or Tracer()
         self.ensure_backup_dir()
         self.config = self.load_config()
+        self.checker = ReachabilityChecker(self.config['connection']['reachability_check'])
 
     def ensure_backup_dir(self):
         if not os.path.exists(BACKUP_DIR):
@@ -36,13 +269,24 @@ class ProviderSwitcher:
             },
             "deepseek": {
                 "api_key": ""
+            },
+            "connection": {
+                "reachability_check": False
             }
         }
 
-        if os.path.exists(CONFIG_PATH):
-            try:
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
+        with self.tracer.span("load_config") as span:
+            if os.path.exists(CONFIG_PATH):
+                try:
+                    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                        raw = f.read()
+                    if self.tracer.enabled:
+                        span.add(bytes_read=len(raw.encode('utf-8')))
+                    loaded = json.loads(raw)
+                    # connection 段格式错误时只重置该段，避免丢弃其余配置
+                    if 'connection' in loaded and not isinstance(loaded['connection'], dict):
+                        print(f"connection 配置无效: {loaded['connection']!r}，已使用默认值")
+                        loaded['connection'] = dict(default_config['connection'])
                     for provider in default_config:
                         if provider not in loaded:
                             loaded[provider] = default_config[provider]
@@ -50,61 +294,93 @@ class ProviderSwitcher:
                             for key in default_config[provider]:
                                 if key not in loaded[provider]:
                                     loaded[provider][key] = default_config[provider][key]
+                    connection = loaded['connection']
+                    if not isinstance(connection['reachability_check'], bool):
+                        print(f"reachability_check 无效: {connection['reachability_check']!r}，已使用默认值")
+                        connection['reachability_check'] = False
                     return loaded
-            except Exception as e:
-                print(f"加载配置文件失败: {e}")
-                return default_config
-        return default_config
+                except Exception as e:
+                    print(f"加载配置文件失败: {e}")
+                    return default_config
+            return default_config
 
     def save_config(self):
-        try:
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"保存配置文件失败: {e}")
-            return False
+        with self.tracer.span("save_config") as span:
+            try:
+                data = json.dumps(self.config, indent=2, ensure_ascii=False)
+                with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                if self.tracer.enabled:
+                    span.add(bytes_written=len(data.encode('utf-8')))
+                return True
+            except Exception as e:
+                print(f"保存配置文件失败: {e}")
+                return False
 
     def backup_zshrc(self):
-        if not os.path.exists(ZSHRC_PATH):
-            return None
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = os.path.join(BACKUP_DIR, f"zshrc_backup_{timestamp}")
-        try:
-            shutil.copy2(ZSHRC_PATH, backup_path)
-            return backup_path
-        except Exception as e:
-            print(f"备份失败: {e}")
-            return None
+        with self.tracer.span("backup_zshrc") as span:
+            if not os.path.exists(ZSHRC_PATH):
+                return None
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_path = os.path.join(BACKUP_DIR, f"zshrc_backup_{timestamp}")
+            try:
+                shutil.copy2(ZSHRC_PATH, backup_path)
+                if self.tracer.enabled:
+                    size = os.path.getsize(backup_path)
+                    span.add(bytes_read=size, bytes_written=size)
+                return backup_path
+            except Exception as e:
+                print(f"备份失败: {e}")
+                return None
 
     def read_zshrc(self):
-        if not os.path.exists(ZSHRC_PATH):
-            return ""
-        try:
-            with open(ZSHRC_PATH, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            print(f"读取 .zshrc 失败: {e}")
-            return None
+        with self.tracer.span("read_zshrc") as span:
+            if not os.path.exists(ZSHRC_PATH):
+                return ""
+            try:
+                with open(ZSHRC_PATH, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                if self.tracer.enabled:
+                    span.add(bytes_read=len(content.encode('utf-8')))
+                return content
+            except Exception as e:
+                print(f"读取 .zshrc 失败: {e}")
+                return None
+
+    def write_zshrc(self, content):
+        with self.tracer.span("write_zshrc") as span:
+            with open(ZSHRC_PATH, 'w', encoding='utf-8') as f:
+                f.write(content)
+            if self.tracer.enabled:
+                span.add(bytes_written=len(content.encode('utf-8')))
 
     def remove_claude_env_section(self, content):
-        lines = content.split('\n')
-        result = []
-        in_claude_section = False
-        for line in lines:
-            if '# Claude Code Environment Variables' in line:
-                in_claude_section = True
-                continue
-            elif '# End Claude Code Environment Variables' in line:
-                in_claude_section = False
-                continue
-            elif not in_claude_section:
-                result.append(line)
-        while result and not result[-1].strip():
-            result.pop()
-        return '\n'.join(result)
+        with self.tracer.span("remove_claude_env_section"):
+            lines = content.split('\n')
+            result = []
+            in_claude_section = False
+            for line in lines:
+                if '# Claude Code Environment Variables' in line:
+                    in_claude_section = True
+                    continue
+                elif '# End Claude Code Environment Variables' in line:
+                    in_claude_section = False
+                    continue
+                elif not in_claude_section:
+                    result.append(line)
+            while result and not result[-1].strip():
+                result.pop()
+            return '\n'.join(result)
 
     def switch_to_third_party(self):
+        with self.tracer.span("switch_to_third_party", summarize=True):
+            success, message = self._switch_to_third_party()
+        # 在区间结束后再启动检查线程，避免其耗时和 I/O 计入切换区间
+        if success:
+            self.checker.check(self.get_base_url('third_party'))
+        return success, message
+
+    def _switch_to_third_party(self):
         if not self.config['third_party']['api_key']:
             return False, "请先配置第三方 API Key"
         backup_path = self.backup_zshrc()
@@ -120,13 +396,20 @@ export ANTHROPIC_API_KEY={self.config['third_party']['api_key']}
 """
         new_content = content + new_section
         try:
-            with open(ZSHRC_PATH, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True, "已切换到第三方 Claude 中转站"
+            self.write_zshrc(new_content)
         except Exception as e:
             return False, f"写入 .zshrc 失败: {e}"
+        return True, "已切换到第三方 Claude 中转站"
 
     def switch_to_deepseek(self):
+        with self.tracer.span("switch_to_deepseek", summarize=True):
+            success, message = self._switch_to_deepseek()
+        # 在区间结束后再启动检查线程，避免其耗时和 I/O 计入切换区间
+        if success:
+            self.checker.check(self.get_base_url('deepseek'))
+        return success, message
+
+    def _switch_to_deepseek(self):
         if not self.config['deepseek']['api_key']:
             return False, "请先配置 DeepSeek API Key"
         backup_path = self.backup_zshrc()
@@ -137,7 +420,7 @@ export ANTHROPIC_API_KEY={self.config['third_party']['api_key']}
         new_section = f"""
 # Claude Code Environment Variables
 export DEEPSEEK_API_KEY={self.config['deepseek']['api_key']}
-export ANTHROPIC_BASE_URL=https://api.deepseek.com/anthropic
+export ANTHROPIC_BASE_URL={DEEPSEEK_BASE_URL}
 export ANTHROPIC_AUTH_TOKEN=${{DEEPSEEK_API_KEY}}
 export API_TIMEOUT_MS=600000
 export ANTHROPIC_MODEL=deepseek-chat
@@ -147,11 +430,28 @@ export CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC=1
 """
         new_content = content + new_section
         try:
-            with open(ZSHRC_PATH, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True, "已切换到 DeepSeek"
+            self.write_zshrc(new_content)
         except Exception as e:
             return False, f"写入 .zshrc 失败: {e}"
+        return True, "已切换到 DeepSeek"
+
+    def get_base_url(self, provider):
+        if provider == 'third_party':
+            return self.config['third_party']['base_url']
+        elif provider == 'deepseek':
+            return DEEPSEEK_BASE_URL
+        return None
+
+    def check_current_provider(self):
+        """为当前生效的提供商做连通性检查"""
+        if not self.checker.enabled:
+            return None
+        current = self.get_current_provider()
+        if current == "DeepSeek":
+            return self.checker.check(self.get_base_url('deepseek'))
+        elif current == "第三方 Claude":
+            return self.checker.check(self.get_base_url('third_party'))
+        return None
 
     def get_current_provider(self):
         content = self.read_zshrc()
@@ -167,13 +467,15 @@ export CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC=1
 class MainWindow:
     """主窗口 - 现代简约风格"""
 
-    def __init__(self, root):
+    def __init__(self, root, tracer=None):
         self.root = root
-        self.switcher = ProviderSwitcher()
+        self.switcher = ProviderSwitcher(tracer)
         self.setup_styles()
         self.init_ui()
         self.load_settings()
         self.update_status()
+        self.switcher.check_current_provider()
+        self.poll_reachability_report()
 
     def setup_styles(self):
         # 使用 ttk 样式
@@ -237,6 +539,9 @@ class MainWindow:
         
         self.status_label = tk.Label(status_frame, text="检测中...", font=('Helvetica', 18, 'bold'), bg=self.colors['card_bg'], fg=self.colors['primary'])
         self.status_label.pack(anchor='w', pady=(5, 0))
+
+        self.reachability_label = tk.Label(status_frame, text="", font=('Helvetica', 11), bg=self.colors['card_bg'], fg=self.colors['subtext'])
+        self.reachability_label.pack(anchor='w', pady=(5, 0))
         
         # 刷新按钮
         refresh_btn = ttk.Button(status_top, text="刷新", command=self.update_status, width=6)
@@ -322,6 +627,12 @@ class MainWindow:
         else:
             self.status_label.config(fg="#8E8E93") # Gray
 
+    def poll_reachability_report(self):
+        # 连通性检查在后台线程完成，这里在主线程中定期刷新显示
+        report = self.switcher.checker.format_report()
+        self.reachability_label.config(text=report or "")
+        self.root.after(1000, self.poll_reachability_report)
+
     def switch_to_third_party(self):
         success, message = self.switcher.switch_to_third_party()
         if success:
@@ -339,10 +650,51 @@ class MainWindow:
             messagebox.showerror("错误", message)
 
 
+def run_profiled(func):
+    """在 cProfile 和 tracemalloc 下运行 func，并将结果保存到 PROFILE_DIR"""
+    if not os.path.exists(PROFILE_DIR):
+        os.makedirs(PROFILE_DIR)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        profile_path = os.path.join(PROFILE_DIR, f"profile_{timestamp}.prof")
+        profiler.dump_stats(profile_path)
+        memory_path = os.path.join(PROFILE_DIR, f"memory_{timestamp}.txt")
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:50]:
+                f.write(f"{stat}\n")
+        print(f"性能分析已保存到: {profile_path}, {memory_path}")
+
+
 def main():
-    root = tk.Tk()
-    app = MainWindow(root)
-    root.mainloop()
+    # --trace: 记录切换各阶段的追踪区间; --profile: 在 cProfile/tracemalloc 下运行
+    tracer = Tracer(enabled='--trace' in sys.argv)
+
+    def run():
+        root = tk.Tk()
+        app = MainWindow(root, tracer)
+        root.mainloop()
+
+    try:
+        if '--profile' in sys.argv:
+            run_profiled(run)
+        else:
+            run()
+    finally:
+        if tracer.enabled and tracer.spans:
+            if not os.path.exists(PROFILE_DIR):
+                os.makedirs(PROFILE_DIR)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            trace_path = os.path.join(PROFILE_DIR, f"trace_{timestamp}.json")
+            tracer.export_chrome_trace(trace_path)
+            print(f"追踪数据已保存到: {trace_path}")
 
 
 if __name__ == "__main__":
@@ -11,4 +11,4 @@ if ! command -v python3 &> /dev/null; then
 fi
 
 # 运行应用（tkinter 是 macOS 自带的，无需安装）
-python3 claude_switcher_app.py
+python3 claude_switcher_app.py "$@"